@@ -1,13 +1,16 @@
 import asyncio
+from collections import deque
 from io import BytesIO
-import itertools
 import json
+import re
 import string
+import time
 import traceback
-from typing import Any, AbstractSet
+from typing import Any, AbstractSet, ValuesView
 import uuid
 
-from cachetools import cached, TTLCache
+from cachetools import TTLCache
+import numpy as np
 from PIL import Image, ImageDraw
 import shapely
 
@@ -35,6 +38,34 @@ from scrypted_sdk import (
 
 from detection_classes import labels, categories, guess_label_matches_category
 
+# frequently used enum values and labels, bound once instead of paying the
+# enum attribute chain on every hot-path check
+_IFACE_CAMERA = ScryptedInterface.Camera.value
+_IFACE_OBJECT_DETECTOR = ScryptedInterface.ObjectDetector.value
+_IFACE_NOTIFIER = ScryptedInterface.Notifier.value
+_IFACE_SETTINGS = ScryptedInterface.Settings.value
+_GROUP = "Notification Zone Filter"
+
+# shared empty result for zone accessors; read-only, so one instance serves
+# every miss without allocating
+_EMPTY: tuple = ()
+
+# settings keys owned by the mixin rather than the wrapped notifier: the
+# static toggles plus the zone keys the editor writes ("<camera>:zones",
+# "<camera>:zone:<name>", "<camera>:zone:<name>:type")
+_MIXIN_SETTING_KEYS = frozenset({"selected_camera", "debug_zones", "use_custom", "selected_preset"})
+_ZONE_KEY_RE = re.compile(r":(zones$|zone:)")
+
+
+# decoded frames, keyed by the hash of the encoded bytes, so back-to-back
+# notifications for the same frame skip the image decode
+_decoded_frame_cache = TTLCache(maxsize=8, ttl=10)
+
+# resolved device proxies, shared by every editor and mixin instance as
+# (expires, device) tuples; each entry carries its own deadline so a lookup
+# after one device's expiry does not throw away every other fresh entry
+_device_cache: dict = {}
+
 
 def draw_polygons_in_memory(image_bytes, polygon1, polygon2, color1, color2):
     """
@@ -50,21 +81,35 @@ def draw_polygons_in_memory(image_bytes, polygon1, polygon2, color1, color2):
     Returns:
         bytes: Modified image as bytes.
     """
-    # Load the image from bytes
-    image = Image.open(BytesIO(image_bytes))
+    # Load the image from bytes, reusing the decoded frame if this image was
+    # just drawn on. Copy before drawing so the cached frame stays clean.
+    frame_key = hash(image_bytes)
+    cached = _decoded_frame_cache.get(frame_key)
+    if cached is None:
+        decoded = Image.open(BytesIO(image_bytes))
+        decoded.load()
+        cached = (decoded, decoded.format)
+        _decoded_frame_cache[frame_key] = cached
+    image = cached[0].copy()
+    source_format = cached[1]
 
     # Create a drawable object
     draw = ImageDraw.Draw(image)
 
     # Draw the first polygon
-    draw.line(polygon1 + [polygon1[0]], fill=color1, width=3)
+    draw.polygon(polygon1, outline=color1, width=3)
 
     # Draw the second polygon
-    draw.line(polygon2 + [polygon2[0]], fill=color2, width=3)
+    draw.polygon(polygon2, outline=color2, width=3)
 
-    # Save the modified image into a byte stream
+    # Save the modified image into a byte stream. JPEG input is re-encoded
+    # as JPEG, which is much cheaper than PNG's DEFLATE pass; otherwise keep
+    # PNG but at the fastest compression level.
     output_bytes_io = BytesIO()
-    image.save(output_bytes_io, format="PNG")
+    if source_format == "JPEG":
+        image.save(output_bytes_io, format="JPEG", quality=85)
+    else:
+        image.save(output_bytes_io, format="PNG", compress_level=1)
 
     # Get the bytes of the modified image
     modified_image_bytes = output_bytes_io.getvalue()
@@ -73,35 +118,52 @@ def draw_polygons_in_memory(image_bytes, polygon1, polygon2, color1, color2):
 
 
 class PrefixStorage(Storage):
+    # one instance per mixed-in notifier plus one per preset, so skip the
+    # per-instance __dict__
+    __slots__ = ("basePlugin", "prefix", "_prefix_colon", "_keys")
 
     def __init__(self, basePlugin: ScryptedDeviceBase, prefix: str):
         self.basePlugin = basePlugin
         self.prefix = prefix
+        self._prefix_colon = prefix + ":"
+        # lazily populated index of this prefix's keys, maintained by
+        # setItem/removeItem so getKeys need not rescan all of storage
+        self._keys: set[str] | None = None
 
     def getItem(self, key: str) -> str:
-        return self.basePlugin.storage.getItem(f"{self.prefix}:{key}")
+        return self.basePlugin.storage.getItem(self._prefix_colon + key)
 
     def setItem(self, key: str, value: str):
-        return self.basePlugin.storage.setItem(f"{self.prefix}:{key}", value)
+        if self._keys is not None:
+            self._keys.add(key)
+        return self.basePlugin.storage.setItem(self._prefix_colon + key, value)
 
     def removeItem(self, key: str):
-        return self.basePlugin.storage.removeItem(f"{self.prefix}:{key}")
+        if self._keys is not None:
+            self._keys.discard(key)
+        return self.basePlugin.storage.removeItem(self._prefix_colon + key)
 
     def getKeys(self) -> AbstractSet[str]:
-        keys = self.basePlugin.storage.getKeys()
-        return {key.removeprefix(f"{self.prefix}:") for key in keys if key.startswith(f"{self.prefix}:")}
+        if self._keys is None:
+            prefix = self._prefix_colon
+            plen = len(prefix)
+            keys = self.basePlugin.storage.getKeys()
+            self._keys = {key[plen:] for key in keys if key.startswith(prefix)}
+        return self._keys
 
     def clear(self):
-        keys = self.getKeys()
-        for key in keys:
-            self.removeItem(key)
+        storage = self.basePlugin.storage
+        prefix = self._prefix_colon
+        for key in set(self.getKeys()):
+            storage.removeItem(prefix + key)
+        self._keys = set()
 
 
 async def reload_settings(device_id, mixin) -> None:
     await scrypted_sdk.deviceManager.onMixinEvent(
         device_id,
         mixin,
-        ScryptedInterface.Settings.value,
+        _IFACE_SETTINGS,
         None
     )
 
@@ -111,7 +173,19 @@ class MixinConsole:
         self.mixinId = mixinId
         self.mixinProvider = mixinProvider
         self.nativeId = mixinProvider.nativeId
+        self.writer = None
+        # single-flight reconnect with bounded exponential backoff
+        self._reconnecting = asyncio.Lock()
+        self._backoff = 1.0
+        # log calls enqueue and return; a single task owns the socket writes
+        # so callers never block on drain
+        self._queue = asyncio.Queue(maxsize=1024)
+        self._dropped = 0
+        # recent messages held while disconnected, flushed after reconnect
+        self._pending = deque(maxlen=256)
+        self._log_prefix = f'[{mixinProvider.name}]: '
         asyncio.create_task(self.tryConnect())
+        asyncio.create_task(self._writer_loop())
 
     async def tryConnect(self) -> None:
         try:
@@ -138,48 +212,69 @@ class MixinConsole:
 
         reader, self.writer = await asyncio.open_connection('localhost', port)
         self.writer.write((mixinNativeId + '\n').encode())
+        if self._pending:
+            self.writer.write(b"".join(self._pending))
+            self._pending.clear()
         await self.writer.drain()
+        self._backoff = 1.0
 
     async def reconnect(self) -> None:
-        try:
-            if self.writer:
-                self.writer.close()
-                await self.writer.wait_closed()
-        except:
-            pass
-        finally:
-            self.writer = None
+        if self._reconnecting.locked():
+            return
 
-        await asyncio.sleep(10000)
-        asyncio.create_task(self.tryConnect())
+        async with self._reconnecting:
+            try:
+                if self.writer:
+                    self.writer.close()
+                    await self.writer.wait_closed()
+            except:
+                pass
+            finally:
+                self.writer = None
 
-    async def log(self, *args):
-        self.mixinProvider.print(*args)
-        try:
-            if not self.writer:
-                return
+            await asyncio.sleep(min(self._backoff, 60))
+            self._backoff *= 2
 
-            message = " ".join([str(arg) for arg in args])
-            message = message.replace('\n', f'\n[{self.mixinProvider.name}]: ')
-            self.writer.write((f'[{self.mixinProvider.name}]: ' + message + '\n').encode())
-            await self.writer.drain()
-        except:
-            asyncio.create_task(self.reconnect())
+        asyncio.create_task(self.tryConnect())
 
-    async def info(self, *args):
-        await self.log(*args)
+    async def _writer_loop(self) -> None:
+        while True:
+            message = await self._queue.get()
+            # coalesce whatever else is already queued into a single write
+            # and drain, amortizing the syscall and event loop wakeup over
+            # bursts of log lines
+            batch = [message]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                if not self.writer:
+                    self._pending.extend(batch)
+                    continue
 
-    async def error(self, *args):
-        await self.log(*args)
+                self.writer.write(b"".join(batch) if len(batch) > 1 else message)
+                await self.writer.drain()
+            except:
+                if not self._reconnecting.locked():
+                    asyncio.create_task(self.reconnect())
 
-    async def warn(self, *args):
-        await self.log(*args)
+    async def log(self, *args):
+        self.mixinProvider.print(*args)
 
-    async def debug(self, *args):
-        await self.log(*args)
+        prefix = self._log_prefix
+        message = " ".join(map(str, args))
+        message = message.replace('\n', '\n' + prefix)
+        try:
+            self._queue.put_nowait((prefix + message + '\n').encode())
+        except asyncio.QueueFull:
+            self._dropped += 1
 
-    async def trace(self, *args):
-        await self.log(*args)
+    # all levels log identically; aliasing avoids an extra coroutine hop per call
+    info = log
+    error = log
+    warn = log
+    debug = log
+    trace = log
 
 
 mixin_consoles = {}
@@ -198,80 +293,168 @@ def getMixinConsole(mixinId, mixinProvider) -> Any:
     return console
 
 
-class ShouldSendNotification(Exception):
-    def __init__(self, reason: str, zone_bbox: shapely.geometry.Polygon = None, obj_bbox: shapely.geometry.Polygon = None):
-        self.reason = reason
-        self.zone_bbox = zone_bbox
-        self.obj_bbox = obj_bbox
-
-
 class NotificationFilterEditor(Camera):
     storage: Storage
     basePlugin: 'NotificationFilter'
 
+    # lazily created cache of scaled, prepared zone polygons, keyed by
+    # (camera_id, zone, inputDimensions)
+    _zone_polygon_cache: TTLCache = None
+
+    def get_zone_polygon(self, camera_id: str, zone: str, inputDimensions: tuple) -> tuple[shapely.geometry.Polygon, bool] | None:
+        if self._zone_polygon_cache is None:
+            self._zone_polygon_cache = TTLCache(maxsize=256, ttl=60)
+
+        key = (camera_id, zone, tuple(inputDimensions))
+        entry = self._zone_polygon_cache.get(key)
+        if entry is not None:
+            return entry
+
+        zone_details = self.zone_details_of(camera_id, zone)
+        if not zone_details:
+            return None
+
+        scaled = np.asarray(zone_details, dtype=np.float64) * (inputDimensions[0], inputDimensions[1])
+        polygon = shapely.geometry.Polygon(scaled)
+        # prepare in place so repeated intersects/contains tests use the
+        # precomputed spatial index; axis-aligned rectangular zones are
+        # flagged once here so the numeric bounds test can stand in for the
+        # polygon predicate entirely
+        shapely.prepare(polygon)
+        entry = (polygon, polygon.equals(polygon.envelope))
+        self._zone_polygon_cache[key] = entry
+        return entry
+
+    def invalidate_zone_polygons(self, key: str) -> None:
+        # drop cached polygons and raw zone reads as soon as a zone
+        # definition changes rather than serving stale data until the TTL
+        # expires
+        if ":zone" not in key:
+            return
+        if self._zone_polygon_cache is not None:
+            self._zone_polygon_cache.clear()
+        if self._zone_raw_cache is not None:
+            self._zone_raw_cache.clear()
+
     @property
     def selected_camera(self) -> list[str]:
         return self.storage.getItem("selected_camera")
 
-    def zones_of(self, camera_id: str) -> list[str]:
-        return self.storage.getItem(f"{camera_id}:zones") or []
-
-    def zone_details_of(self, camera_id: str, zone: str) -> list[list[float]]:
-        return self.storage.getItem(f"{camera_id}:zone:{zone}") or []
+    # lazily created cache of per-camera storage key prefixes, so the zone
+    # accessors concatenate instead of formatting on every read
+    _camera_key_cache: dict = None
+
+    # lazily created cache of zone details/types as read from storage, so
+    # repeated accessor calls during a notification skip the storage layer
+    _zone_raw_cache: dict = None
+
+    def _camera_keys(self, camera_id: str) -> tuple[str, str]:
+        if self._camera_key_cache is None:
+            self._camera_key_cache = {}
+        keys = self._camera_key_cache.get(camera_id)
+        if keys is None:
+            keys = (f"{camera_id}:zones", f"{camera_id}:zone:")
+            self._camera_key_cache[camera_id] = keys
+        return keys
+
+    def zones_of(self, camera_id: str) -> list[str] | tuple:
+        # the shared empty tuple avoids allocating a throwaway list per read
+        # when the camera has no zones; callers only iterate
+        return self.storage.getItem(self._camera_keys(camera_id)[0]) or _EMPTY
+
+    def has_any_zones(self) -> bool:
+        # cheap gate for the common "filter enabled but nothing configured"
+        # case; getKeys is served from the in-memory key index
+        for key in self.storage.getKeys():
+            if key.endswith(":zones") and self.storage.getItem(key):
+                return True
+        return False
+
+    def zone_details_of(self, camera_id: str, zone: str) -> list[list[float]] | tuple:
+        cache = self._zone_raw_cache
+        if cache is None:
+            cache = self._zone_raw_cache = {}
+        key = self._camera_keys(camera_id)[1] + zone
+        if key not in cache:
+            cache[key] = self.storage.getItem(key) or _EMPTY
+        return cache[key]
 
     def zone_type_of(self, camera_id: str, zone: str) -> str:
-        return self.storage.getItem(f"{camera_id}:zone:{zone}:type") or "Intersect"
+        cache = self._zone_raw_cache
+        if cache is None:
+            cache = self._zone_raw_cache = {}
+        key = self._camera_keys(camera_id)[1] + zone + ":type"
+        if key not in cache:
+            cache[key] = self.storage.getItem(key) or "Intersect"
+        return cache[key]
 
     def get_all_detector_cameras(self) -> list[str]:
         detector_cameras = []
         state = scrypted_sdk.systemManager.getSystemState()
-        for device_id in state.keys():
-            device = self.get_device_from_scrypted(device_id)
-            if not device:
+        # prevent looping back to self; build the excluded id set once
+        # rather than scanning the id lists per device
+        excluded = set(self.basePlugin.all_mixin_device_ids()) | set(self.basePlugin.all_preset_device_ids())
+        # locals for the per-device loop; global/attribute lookups add up
+        # over a few hundred devices
+        camera_iface = _IFACE_CAMERA
+        detector_iface = _IFACE_OBJECT_DETECTOR
+        append = detector_cameras.append
+        for device_id, entry in state.items():
+            if device_id in excluded:
                 continue
 
-            # prevent looping back to self
-            if device.id in self.basePlugin.all_mixin_device_ids() or \
-                device.id in self.basePlugin.all_preset_device_ids():
-                continue
-
-            if ScryptedInterface.Camera.value in device.interfaces and \
-                ScryptedInterface.ObjectDetector.value in device.interfaces:
-                detector_cameras.append(device.id)
+            # the system state already carries interface metadata, so filter
+            # here instead of resolving a device proxy per candidate
+            interfaces = (entry.get("interfaces") or {}).get("value") or []
+            if camera_iface in interfaces and \
+                detector_iface in interfaces:
+                append(device_id)
         return detector_cameras
 
-    @cached(cache=TTLCache(maxsize=1024, ttl=5))
     def get_device_from_scrypted(self, device_id: str) -> ScryptedDevice:
         if not device_id:
             return None
-        return scrypted_sdk.systemManager.getDeviceById(device_id)
+
+        now = time.monotonic()
+        entry = _device_cache.get(device_id)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        device = scrypted_sdk.systemManager.getDeviceById(device_id)
+        _device_cache[device_id] = (now + 5.0, device)
+        return device
 
     def is_valid_camera(self, camera_id: str) -> bool:
         camera = self.get_device_from_scrypted(camera_id)
-        return camera is not None and \
-            ScryptedInterface.Camera.value in camera.interfaces and \
-            ScryptedInterface.ObjectDetector.value in camera.interfaces
+        if camera is None:
+            return False
+        # one pass over the interface list instead of two linear scans
+        interfaces = frozenset(camera.interfaces)
+        return _IFACE_CAMERA in interfaces and _IFACE_OBJECT_DETECTOR in interfaces
+
+    # static portion of the camera picker; editor_settings copies it and
+    # fills in the per-render value and deviceFilter
+    _SELECTED_CAMERA_SETTING = {
+        "group": _GROUP,
+        "key": "selected_camera",
+        "title": "Configure Zones for Camera",
+        "description": "Select a camera to configure zones for.",
+        "immediate": True,
+        "type": "device",
+    }
 
     def editor_settings(self) -> list[Setting]:
         cameras = self.get_all_detector_cameras()
-        settings = [
-            {
-                "group": "Notification Zone Filter",
-                "key": "selected_camera",
-                "title": "Configure Zones for Camera",
-                "description": "Select a camera to configure zones for.",
-                "value": self.selected_camera,
-                "immediate": True,
-                "type": "device",
-                "deviceFilter": f"{json.dumps(cameras)}.includes(id)",
-            },
-        ]
+        selected_camera_setting = dict(self._SELECTED_CAMERA_SETTING)
+        selected_camera_setting["value"] = self.selected_camera
+        selected_camera_setting["deviceFilter"] = f"{json.dumps(cameras)}.includes(id)"
+        settings = [selected_camera_setting]
 
         if self.selected_camera:
             camera_id = self.selected_camera
             zones = self.zones_of(camera_id)
             settings.append({
-                "group": "Notification Zone Filter",
+                "group": _GROUP,
                 "key": f"{camera_id}:zones",
                 "description": "Enter the name of a new zone or delete an existing zone.",
                 "multiple": True,
@@ -279,31 +462,32 @@ class NotificationFilterEditor(Camera):
                 "choices": zones,
                 "value": zones,
             })
-            zone_settings = itertools.chain(*[
-                [
-                    {
-                        "group": "Notification Zone Filter",
-                        "subgroup": f"Zone: {zone}",
-                        "key": f"{camera_id}:zone:{zone}",
-                        "title": "Open Zone Editor",
-                        "type": "clippath",
-                        "value": self.zone_details_of(self.selected_camera, zone)
-                    },
-                    {
-                        "group": "Notification Zone Filter",
-                        "subgroup": f"Zone: {zone}",
-                        "key": f"{camera_id}:zone:{zone}:type",
-                        "title": "Zone Type",
-                        "choices": ["Intersect", "Contain"],
-                        "description": "An Intersect zone will match objects that are partially or fully inside the zone. A Contain zone will only match objects that are fully inside the zone.",
-                        "value": self.zone_type_of(self.selected_camera, zone)
-                    }
-                ] for zone in zones
-            ])
-            settings.extend(zone_settings)
+            settings.extend(setting for zone in zones for setting in self._zone_settings(camera_id, zone))
 
         return settings
 
+    def _zone_settings(self, camera_id: str, zone: str) -> tuple[Setting, Setting]:
+        zone_key = self._camera_keys(camera_id)[1] + zone
+        return (
+            {
+                "group": _GROUP,
+                "subgroup": f"Zone: {zone}",
+                "key": zone_key,
+                "title": "Open Zone Editor",
+                "type": "clippath",
+                "value": self.zone_details_of(camera_id, zone)
+            },
+            {
+                "group": _GROUP,
+                "subgroup": f"Zone: {zone}",
+                "key": zone_key + ":type",
+                "title": "Zone Type",
+                "choices": ["Intersect", "Contain"],
+                "description": "An Intersect zone will match objects that are partially or fully inside the zone. A Contain zone will only match objects that are fully inside the zone.",
+                "value": self.zone_type_of(camera_id, zone)
+            },
+        )
+
     async def getPictureOptions(self) -> list[ResponsePictureOptions]:
         camera: Camera | None = self.get_device_from_scrypted(self.selected_camera)
         if not camera:
@@ -328,7 +512,8 @@ class NotificationFilterPreset(ScryptedDeviceBase, Settings, NotificationFilterE
 
     async def putSetting(self, key: str, value: str) -> None:
         self.storage.setItem(key, value)
-        await self.onDeviceEvent(ScryptedInterface.Settings.value, None)
+        self.invalidate_zone_polygons(key)
+        await self.onDeviceEvent(_IFACE_SETTINGS, None)
 
 
 class NotificationFilterMixin(Notifier, Settings, NotificationFilterEditor):
@@ -352,126 +537,213 @@ class NotificationFilterMixin(Notifier, Settings, NotificationFilterEditor):
         # note that this is the scrypted device id, not the nativeId!
         return self.storage.getItem("selected_preset")
 
-    async def sendNotification(self, title: str, options: NotifierOptions = None, media: str | MediaObject = None, icon: str | MediaObject = None) -> None:
-        #await self.mixinConsole.info(json.dumps(options, indent=2))
+    def _evaluate_notification(self, options: NotifierOptions) -> tuple | None:
+        """
+        Decide whether a notification should be forwarded.
 
-        try:
-            if not self.use_custom() and not self.selected_preset():
-                raise ShouldSendNotification("no preset selected")
+        Returns None when a zone matched nothing and the notification should
+        be dropped, otherwise a (reason, zone_bbox, obj_bbox, device_id,
+        recordedEvent) tuple. Plain returns rather than exceptions: this runs
+        on every notification and raising is an order of magnitude slower.
+        """
+        if not self.use_custom() and not self.selected_preset():
+            return ("no preset selected", None, None, None, None)
 
-            if not self.use_custom() and not self.get_device_from_scrypted(self.selected_preset()):
-                raise ShouldSendNotification("preset not found")
+        if not self.use_custom() and not self.get_device_from_scrypted(self.selected_preset()):
+            return ("preset not found", None, None, None, None)
 
-            body = options.get("body", "").translate(str.maketrans('', '', string.punctuation)).lower()
-            body_tokens = body.split()
-            notification_subject_category = next((token for token in body_tokens if token in categories()), None)
+        body = options.get("body", "").translate(str.maketrans('', '', string.punctuation)).lower()
+        body_tokens = body.split()
+        notification_subject_category = next((token for token in body_tokens if token in categories()), None)
 
-            if self.use_custom():
-                preset = self
-            else:
-                preset = self.basePlugin.get_preset_by_scrypted_id(self.selected_preset())
+        if self.use_custom():
+            preset = self
+        else:
+            preset = self.basePlugin.get_preset_by_scrypted_id(self.selected_preset())
 
-            if not options:
-                raise ShouldSendNotification("no options")
+        # bail before any event parsing or geometry when nothing is
+        # configured for any camera
+        if not preset or not preset.has_any_zones():
+            return ("no zones configured", None, None, None, None)
 
-            if "recordedEvent" not in options:
-                raise ShouldSendNotification("no recordedEvent")
-            recordedEvent = options["recordedEvent"]
+        if not options:
+            return ("no options", None, None, None, None)
 
-            if recordedEvent.get("id"):
-                device_id = recordedEvent["id"]
-            elif "data" in options and "snoozeId" in options["data"]:
-                # TODO: remove this once we have the actual device id in the event
-                device_id = options["data"]["snoozeId"].split("-")[1]
-            else:
-                raise ShouldSendNotification("no device id")
+        if "recordedEvent" not in options:
+            return ("no recordedEvent", None, None, None, None)
+        recordedEvent = options["recordedEvent"]
+
+        if recordedEvent.get("id"):
+            device_id = recordedEvent["id"]
+        elif "data" in options and "snoozeId" in options["data"]:
+            # TODO: remove this once we have the actual device id in the event
+            device_id = options["data"]["snoozeId"].split("-")[1]
+        else:
+            return ("no device id", None, None, None, recordedEvent)
 
-            zones = preset.zones_of(device_id)
-            if not zones:
-                raise ShouldSendNotification("no zones")
+        zones = preset.zones_of(device_id)
+        if not zones:
+            return ("no zones", None, None, device_id, recordedEvent)
 
-            if "data" in recordedEvent and "detections" in recordedEvent["data"]:
-                detections = recordedEvent["data"]["detections"]
+        if "data" in recordedEvent and "detections" in recordedEvent["data"]:
+            detections = recordedEvent["data"]["detections"]
+        else:
+            return ("no detections", None, None, device_id, recordedEvent)
+
+        if "inputDimensions" not in recordedEvent["data"]:
+            return ("no inputDimensions", None, None, device_id, recordedEvent)
+        inputDimensions = recordedEvent["data"]["inputDimensions"]
+
+        # collect the configured zone polygons once, split by zone type,
+        # so each detection is tested with one vectorized shapely call
+        # per group instead of a Python loop over zones
+        intersect_zones = []
+        intersect_rects = []
+        contain_zones = []
+        contain_rects = []
+        for zone in zones:
+            entry = preset.get_zone_polygon(device_id, zone, inputDimensions)
+            if entry is None:
+                continue
+
+            zone_box, is_rect = entry
+            if preset.zone_type_of(device_id, zone) == "Intersect":
+                intersect_zones.append(zone_box)
+                intersect_rects.append(is_rect)
             else:
-                raise ShouldSendNotification("no detections")
+                contain_zones.append(zone_box)
+                contain_rects.append(is_rect)
+
+        # flatten eligible detections into structure-of-arrays form so the
+        # boxes are built by one vectorized shapely call instead of a
+        # constructor call per detection
+        eligible = [
+            detection["boundingBox"] for detection in detections
+            if "boundingBox" in detection and "className" in detection
+            and detection["className"] != "motion"
+            and (not notification_subject_category or guess_label_matches_category(detection["className"], notification_subject_category))
+        ]
 
-            if "inputDimensions" not in recordedEvent["data"]:
-                raise ShouldSendNotification("no inputDimensions")
-            inputDimensions = recordedEvent["data"]["inputDimensions"]
+        if not eligible or (not intersect_zones and not contain_zones):
+            return ("no detections or no zones", None, None, device_id, recordedEvent)
+
+        intersect_zones = np.array(intersect_zones, dtype=object)
+        contain_zones = np.array(contain_zones, dtype=object)
+        intersect_rects = np.array(intersect_rects, dtype=bool)
+        contain_rects = np.array(contain_rects, dtype=bool)
+        intersect_bounds = shapely.bounds(intersect_zones) if len(intersect_zones) else None
+        contain_bounds = shapely.bounds(contain_zones) if len(contain_zones) else None
+
+        bbs = np.array(eligible, dtype=np.float64)
+        bx0, by0 = bbs[:, 0], bbs[:, 1]
+        bx1, by1 = bx0 + bbs[:, 2], by0 + bbs[:, 3]
+        detection_boxes = shapely.box(bx0, by0, bx1, by1)
+
+        # cheap numeric bounding box overlap rejects most
+        # (detection, zone) pairs before any polygon math; broadcasting
+        # computes the whole matrix in a handful of vectorized ops. With
+        # enough zones a spatial index answers the same question in
+        # sub-linear time per detection, so switch to an STRtree there.
+        intersect_tree = None
+        if len(intersect_zones) >= 4:
+            intersect_tree = shapely.STRtree(intersect_zones)
+        elif len(intersect_zones):
+            intersect_overlap = (intersect_bounds[None, :, 0] <= bx1[:, None]) & (intersect_bounds[None, :, 1] <= by1[:, None]) & \
+                (intersect_bounds[None, :, 2] >= bx0[:, None]) & (intersect_bounds[None, :, 3] >= by0[:, None])
+
+        if len(contain_zones):
+            # a zone can only contain a detection whose bounding box lies
+            # entirely within the zone's bounds, which is stricter than
+            # the overlap test used for Intersect zones
+            contain_overlap = (contain_bounds[None, :, 0] <= bx0[:, None]) & (contain_bounds[None, :, 1] <= by0[:, None]) & \
+                (contain_bounds[None, :, 2] >= bx1[:, None]) & (contain_bounds[None, :, 3] >= by1[:, None])
+
+        for i in range(len(detection_boxes)):
+            if len(intersect_zones):
+                if intersect_tree is not None:
+                    overlap_row = np.zeros(len(intersect_zones), dtype=bool)
+                    overlap_row[intersect_tree.query(detection_boxes[i])] = True
+                else:
+                    overlap_row = intersect_overlap[i]
+
+                # for rectangular zones the bounds test is the predicate,
+                # so only non-rectangular candidates need shapely
+                rect_hits = overlap_row & intersect_rects
+                if rect_hits.any():
+                    zone_box = intersect_zones[int(rect_hits.argmax())]
+                    return (f"bounding box {detection_boxes[i]} intersects zone {zone_box}", zone_box, detection_boxes[i], device_id, recordedEvent)
+
+                candidates = intersect_zones[overlap_row & ~intersect_rects]
+                if len(candidates):
+                    hits = shapely.intersects(candidates, detection_boxes[i])
+                    if hits.any():
+                        zone_box = candidates[int(hits.argmax())]
+                        return (f"bounding box {detection_boxes[i]} intersects zone {zone_box}", zone_box, detection_boxes[i], device_id, recordedEvent)
+
+            if len(contain_zones):
+                rect_hits = contain_overlap[i] & contain_rects
+                if rect_hits.any():
+                    zone_box = contain_zones[int(rect_hits.argmax())]
+                    return (f"bounding box {detection_boxes[i]} is inside zone {zone_box}", zone_box, detection_boxes[i], device_id, recordedEvent)
+
+                candidates = contain_zones[contain_overlap[i] & ~contain_rects]
+                if len(candidates):
+                    hits = shapely.contains(candidates, detection_boxes[i])
+                    if hits.any():
+                        zone_box = candidates[int(hits.argmax())]
+                        return (f"bounding box {detection_boxes[i]} is inside zone {zone_box}", zone_box, detection_boxes[i], device_id, recordedEvent)
+        # nothing matched, so don't send
+        return None
 
-            no_zones_at_all = True
-            for detection in detections:
-                if "boundingBox" not in detection or "className" not in detection:
-                    continue
+    async def sendNotification(self, title: str, options: NotifierOptions = None, media: str | MediaObject = None, icon: str | MediaObject = None) -> None:
+        try:
+            decision = self._evaluate_notification(options)
+        except Exception as e:
+            await self.mixinConsole.error(f"Failed to filter notification: {e}")
+            await self.mixinDevice.sendNotification(title, options, media, icon)
+            return
 
-                if detection["className"] == "motion":
-                    continue
+        if decision is None:
+            await self.mixinConsole.info(f"Skipping notification: {title}")
+            return
 
-                if notification_subject_category and not guess_label_matches_category(detection["className"], notification_subject_category):
-                    continue
+        reason, zone_bbox, obj_bbox, device_id, recordedEvent = decision
+        await self.mixinConsole.info(f"Sending notification {title} because: {reason}")
 
-                boundingBox = detection["boundingBox"]
-                detection_box = shapely.geometry.box(boundingBox[0], boundingBox[1], boundingBox[0] + boundingBox[2], boundingBox[1] + boundingBox[3])
-
-                for zone in zones:
-                    zone_details = preset.zone_details_of(device_id, zone)
-                    if not zone_details:
-                        continue
-
-                    zone_details = [[x * inputDimensions[0], y * inputDimensions[1]] for [x, y] in zone_details]
-                    zone_box = shapely.geometry.Polygon(zone_details)
-                    no_zones_at_all = False
-
-                    if preset.zone_type_of(device_id, zone) == "Intersect":
-                        if detection_box.intersects(zone_box):
-                            raise ShouldSendNotification(f"bounding box {detection_box} intersects zone {zone_box}", zone_box, detection_box)
-                    else:
-                        if zone_box.contains(detection_box):
-                            raise ShouldSendNotification(f"bounding box {detection_box} is inside zone {zone_box}", zone_box, detection_box)
-
-            if no_zones_at_all:
-                raise ShouldSendNotification("no detections or no zones")
-        except ShouldSendNotification as e:
-            await self.mixinConsole.info(f"Sending notification {title} because: {e.reason}")
-
-            if self.debug_zones() and e.zone_bbox and e.obj_bbox:
-                try:
-                    device = scrypted_sdk.systemManager.getDeviceById(device_id)
-
-                    if "detectionId" in recordedEvent["data"]:
-                        try:
-                            image = await device.getDetectionInput(recordedEvent["data"]["detectionId"])
-                        except Exception as e2:
-                            await self.mixinConsole.error(f"Failed to get detection input: {e2}")
-                            image = await device.takePicture()
-                    else:
+        if self.debug_zones() and zone_bbox is not None and obj_bbox is not None:
+            try:
+                device = scrypted_sdk.systemManager.getDeviceById(device_id)
+
+                if "detectionId" in recordedEvent["data"]:
+                    try:
+                        image = await device.getDetectionInput(recordedEvent["data"]["detectionId"])
+                    except Exception as e2:
+                        await self.mixinConsole.error(f"Failed to get detection input: {e2}")
                         image = await device.takePicture()
-                    image_bytes = await scrypted_sdk.mediaManager.convertMediaObjectToBuffer(image, "image/png")
+                else:
+                    image = await device.takePicture()
+                # jpeg is considerably cheaper to encode than png and this
+                # is a lossy debug snapshot anyway
+                image_bytes = await scrypted_sdk.mediaManager.convertMediaObjectToBuffer(image, "image/jpeg")
 
-                    zone_bbox = [(x, y) for x, y in e.zone_bbox.exterior.coords]
-                    obj_bbox = [(x, y) for x, y in e.obj_bbox.exterior.coords]
-                    modified_image_bytes = draw_polygons_in_memory(image_bytes, zone_bbox, obj_bbox, 'red', 'blue')
-                    media = await scrypted_sdk.mediaManager.createMediaObject(modified_image_bytes, "image/png")
-                except Exception as e:
-                    await self.mixinConsole.error(f"Failed to draw polygons: {e}")
+                zone_coords = [(x, y) for x, y in zone_bbox.exterior.coords]
+                obj_coords = [(x, y) for x, y in obj_bbox.exterior.coords]
+                modified_image_bytes = draw_polygons_in_memory(image_bytes, zone_coords, obj_coords, 'red', 'blue')
+                media = await scrypted_sdk.mediaManager.createMediaObject(modified_image_bytes, "image/jpeg")
+            except Exception as e:
+                await self.mixinConsole.error(f"Failed to draw polygons: {e}")
 
-            await self.mixinDevice.sendNotification(title, options, media, icon)
-        except Exception as e:
-            await self.mixinConsole.error(f"Failed to filter notification: {e}")
-            await self.mixinDevice.sendNotification(title, options, media, icon)
-        else:
-            # nothing matched, so don't send
-            await self.mixinConsole.info(f"Skipping notification: {title}")
+        await self.mixinDevice.sendNotification(title, options, media, icon)
 
     async def getSettings(self) -> list[Setting]:
         try:
             settings = []
-            if ScryptedInterface.Settings.value in self.mixinDeviceInterfaces:
+            if _IFACE_SETTINGS in self.mixinDeviceInterfaces:
                 settings.extend(await self.mixinDevice.getSettings())
 
             settings.append(
                 {
-                    "group": "Notification Zone Filter",
+                    "group": _GROUP,
                     "key": "use_custom",
                     "title": "Use Custom Zones",
                     "description": "Enable to use custom zones for this notifier. Presets will not be used when enabled.",
@@ -487,7 +759,7 @@ class NotificationFilterMixin(Notifier, Settings, NotificationFilterEditor):
                 presets = [device.id for device in presets]
                 settings.append(
                     {
-                        "group": "Notification Zone Filter",
+                        "group": _GROUP,
                         "key": "selected_preset",
                         "title": "Select Zone Filter Preset",
                         "description": "Select a preset to use for this notifier.",
@@ -499,7 +771,7 @@ class NotificationFilterMixin(Notifier, Settings, NotificationFilterEditor):
 
             settings.append(
                 {
-                    "group": "Notification Zone Filter",
+                    "group": _GROUP,
                     "key": "debug_zones",
                     "title": "Debug Zones",
                     "description": "Enable debug zones to send a full frame snapshot with the zone and object bounding boxes, replacing the original notification's image.",
@@ -513,14 +785,12 @@ class NotificationFilterMixin(Notifier, Settings, NotificationFilterEditor):
             traceback.print_exc()
 
     async def putSetting(self, key: str, value: str | list[str] | list[list[float]]) -> None:
-        editor_settings = self.editor_settings()
-        my_keys = [setting["key"] for setting in editor_settings] + ["debug_zones", "use_custom", "selected_preset"]
-
-        if key not in my_keys:
+        if key not in _MIXIN_SETTING_KEYS and not _ZONE_KEY_RE.search(key):
             await self.mixinDevice.putSetting(key, value)
             return
 
         self.storage.setItem(key, value)
+        self.invalidate_zone_polygons(key)
         await reload_settings(self.mixinDeviceState.id, self)
 
 
@@ -532,28 +802,41 @@ class NotificationFilter(ScryptedDeviceBase, MixinProvider, DeviceProvider, Devi
         # these use nativeIds as keys
         self.mixin_dict = {}
         self.preset_devices = {}
+        # secondary index of presets by scrypted device id, populated lazily
+        # since a preset's id is not assigned until the device is ready
+        self.preset_by_scrypted_id = {}
 
     def print(self, *args):
         print(*args)
 
-    def all_mixin_device_ids(self) -> list[str]:
-        return list(self.mixin_dict.keys())
+    # dict views are returned without copying; callers only iterate or test
+    # membership
+    def all_mixin_device_ids(self) -> AbstractSet[str]:
+        return self.mixin_dict.keys()
 
-    def all_preset_device_ids(self) -> list[str]:
-        return list(self.preset_devices.keys())
+    def all_preset_device_ids(self) -> AbstractSet[str]:
+        return self.preset_devices.keys()
 
-    def all_preset_devices(self) -> list[NotificationFilterPreset]:
-        return list(self.preset_devices.values())
+    def all_preset_devices(self) -> ValuesView[NotificationFilterPreset]:
+        return self.preset_devices.values()
 
     def get_preset_by_scrypted_id(self, device_id) -> NotificationFilterPreset:
+        preset = self.preset_by_scrypted_id.get(device_id)
+        if preset:
+            return preset
         for preset in self.all_preset_devices():
             if preset.id == device_id:
+                self.preset_by_scrypted_id[device_id] = preset
                 return preset
         return None
 
+    # interfaces provided to every mixed-in notifier; built once since
+    # canMixin runs for each candidate device at attach time
+    _MIXIN_INTERFACES = [_IFACE_NOTIFIER, _IFACE_SETTINGS, _IFACE_CAMERA]
+
     async def canMixin(self, type: ScryptedDeviceType, interfaces: list[str]) -> None | list[str]:
-        if (ScryptedInterface.Notifier.value in interfaces):
-            return [ScryptedInterface.Notifier.value, ScryptedInterface.Settings.value, ScryptedInterface.Camera.value]
+        if (_IFACE_NOTIFIER in interfaces):
+            return self._MIXIN_INTERFACES
         return None
 
     async def getMixin(self, mixinDevice: ScryptedDevice, mixinDeviceInterfaces: list[str], mixinDeviceState: WritableDeviceState) -> Any:
@@ -580,8 +863,8 @@ class NotificationFilter(ScryptedDeviceBase, MixinProvider, DeviceProvider, Devi
             'nativeId': nativeId,
             'name': name,
             'interfaces': [
-                ScryptedInterface.Camera.value,
-                ScryptedInterface.Settings.value,
+                _IFACE_CAMERA,
+                _IFACE_SETTINGS,
             ],
             'type': ScryptedDeviceType.API.value,
         })
@@ -599,6 +882,7 @@ class NotificationFilter(ScryptedDeviceBase, MixinProvider, DeviceProvider, Devi
     async def releaseDevice(self, id: str, nativeId: str) -> None:
         if nativeId in self.preset_devices:
             del self.preset_devices[nativeId]
+        self.preset_by_scrypted_id.pop(id, None)
 
     async def getDevice(self, nativeId: str) -> Any:
         if nativeId not in self.preset_devices: